@@ -46,7 +46,7 @@ def seed_project(creator, name, description, data_file, label_list, perm_list, c
 
     batch_size = 10 * len(labels)
     project.batch_size = batch_size
-    project.save()
+    project.save(update_fields=['batch_size'])
 
     num_coders = len(permissions) + 1
     q_length = find_queue_length(batch_size, num_coders)
@@ -82,7 +82,7 @@ def label_project(project, profile, num_labels):
 
     task_num = tasks.send_model_task.apply(args=[project.pk])
     current_training_set.celery_task_id = task_num
-    current_training_set.save()
+    current_training_set.save(update_fields=['celery_task_id'])
 
 
 class Command(BaseCommand):
@@ -2,7 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.urls import reverse
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
+from django.core.cache import cache
 from django.dispatch import receiver
 from django.contrib.postgres.fields import JSONField
 from django.core.validators import MaxValueValidator, MinValueValidator
@@ -79,10 +80,7 @@ class Project(models.Model):
         return self.data_set.all().filter(datalabel__isnull=False).count()
 
     def has_model(self):
-        if self.model_set.count() > 0:
-            return True
-        else:
-            return False
+        return self.model_set.exists()
 
 
 class ProjectPermissions(models.Model):
@@ -133,6 +131,12 @@ class Label(models.Model):
         return self.name
 
 
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+def clear_label_cache(sender, instance, **kwargs):
+    cache.delete('labels:' + str(instance.project_id))
+
+
 class IRRLog(models.Model):
     class Meta:
         unique_together = (('data', 'profile'))
@@ -26,11 +26,11 @@ def send_model_task(project_pk):
     TrainingSet.objects.create(project=project, set_number=project.get_current_training_set().set_number + 1)
 
     # Determine if queue size has changed (num_coders changed) and re-fill queue
-    num_coders = len(project.projectpermissions_set.all()) + 1
+    num_coders = project.projectpermissions_set.count() + 1
     q_length = find_queue_length(batch_size, num_coders)
     if q_length != queue.length:
         queue.length = q_length
-        queue.save()
+        queue.save(update_fields=['length'])
 
     fill_queue(queue, irr_queue=irr_queue, orderby=al_method,
                irr_percent=project.percentage_irr, batch_size=batch_size)
@@ -48,8 +48,10 @@ def send_tfidf_creation_task(project_pk):
     return file
 
 
-@shared_task
+@shared_task(acks_late=True)
 def send_check_and_trigger_model_task(project_pk):
+    """Check if the project model needs to run. Safe to retry, as a running
+    model or full queue is left alone."""
     from core.utils.utils_model import check_and_trigger_model
     from core.models import Data
 
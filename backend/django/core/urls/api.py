@@ -25,6 +25,7 @@ annotate_patterns = [
     url(r'^modify_label/(?P<data_pk>\d+)/$', api_annotate.modify_label),
     url(r'^modify_label_to_skip/(?P<data_pk>\d+)/$', api_annotate.modify_label_to_skip),
     url(r'^skip_data/(?P<data_pk>\d+)/$', api_annotate.skip_data),
+    url(r'^skip_data_bulk/(?P<project_pk>\d+)/$', api_annotate.skip_data_bulk),
     url(r'^enter_coding_page/(?P<project_pk>\d+)/$', api_annotate.enter_coding_page),
     url(r'^leave_coding_page/(?P<project_pk>\d+)/$', api_annotate.leave_coding_page),
     url(r'^data_unlabeled_table/(?P<project_pk>\d+)/$', api_annotate.data_unlabeled_table),
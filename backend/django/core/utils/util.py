@@ -201,12 +201,13 @@ def perc_agreement_table_data(project):
     '''
     irr_data = set(IRRLog.objects.filter(data__project=project).values_list('data', flat=True))
 
-    user_list = [str(Profile.objects.get(pk=x)) for x in list(
-        ProjectPermissions.objects.filter(project=project).values_list('profile', flat=True))]
-    user_list.append(str(project.creator))
-    user_pk_list = list(ProjectPermissions.objects.filter(
-        project=project).values_list('profile__pk', flat=True))
-    user_pk_list.append(project.creator.pk)
+    # load the users once with their names, rather than per datum
+    profiles = [perm.profile for perm in ProjectPermissions.objects.filter(
+        project=project).select_related('profile__user')]
+    profiles.append(project.creator)
+    user_list = [str(p) for p in profiles]
+    user_pk_list = [p.pk for p in profiles]
+    user_names = dict(zip(user_pk_list, user_list))
     # get all possible pairs of users
     user_combinations = combinations(user_list, r=2)
     data_choices = []
@@ -221,14 +222,14 @@ def perc_agreement_table_data(project):
         temp_dict = {}
         for user in user_pk_list:
             if d_log.filter(profile=user).count() == 0:
-                temp_dict[str(Profile.objects.get(pk=user))] = np.nan
+                temp_dict[user_names[user]] = np.nan
             else:
                 d = d_log.get(profile=user)
                 if d.label is None:
                     name = "Skip"
                 else:
                     name = d.label.name
-                temp_dict[str(d.profile)] = name
+                temp_dict[user_names[user]] = name
         data_choices.append(temp_dict)
     # If there is no data, just return nothing
     if len(data_choices) == 0:
@@ -357,11 +358,12 @@ def get_labeled_data(project):
     labels = []
     for label in project_labels:
         labels.append({"Name": label.name, "Label_ID": label.pk})
-        labeled_data = DataLabel.objects.filter(label=label)
+        # join the data columns into the label query rather than loading each datum
+        labeled_data = DataLabel.objects.filter(label=label).values('data__upload_id', 'data__text')
         for d in labeled_data:
             temp = {}
-            temp['ID'] = d.data.upload_id
-            temp['Text'] = d.data.text
+            temp['ID'] = d['data__upload_id']
+            temp['Text'] = d['data__text']
             temp['Label'] = label.name
             data.append(temp)
     labeled_data_frame = pd.DataFrame(data)
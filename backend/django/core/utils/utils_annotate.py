@@ -1,13 +1,32 @@
 from django.utils import timezone
 from django.db import transaction
 from django.conf import settings
+from django.core.cache import cache
 
-from core.models import Data, Queue, DataQueue, AssignedData, DataLabel, IRRLog
+from core.models import Data, Label, Queue, DataQueue, AssignedData, DataLabel, IRRLog
 from core.utils.utils_queue import pop_first_nonempty_queue
 from core.utils.utils_redis import redis_serialize_data, redis_serialize_queue, redis_serialize_set
 from core.templatetags import project_extras
 
 
+def get_label(project, label_pk):
+    '''
+    Return the project's label with the given primary key. The project's labels
+    are cached, since they are read on every annotation but only change when
+    the project is edited (see core.models.clear_label_cache).
+    '''
+    cache_key = 'labels:' + str(project.pk)
+    labels = cache.get(cache_key)
+    if labels is None:
+        labels = {label.pk: label for label in Label.objects.filter(project=project)}
+        cache.set(cache_key, labels, 600)
+
+    try:
+        return labels[int(label_pk)]
+    except KeyError:
+        raise Label.DoesNotExist('Label ' + str(label_pk) + ' is not in this project')
+
+
 def assign_datum(profile, project, type="normal"):
     '''
     Given a profile and project, figure out which queue to pull from;
@@ -18,8 +37,7 @@ def assign_datum(profile, project, type="normal"):
         if datum is None:
             return None
         else:
-            num_labeled = DataLabel.objects.filter(data=datum, profile=profile).count()
-            if num_labeled == 0:
+            if not DataLabel.objects.filter(data=datum, profile=profile).exists():
                 AssignedData.objects.create(data=datum, profile=profile,
                                             queue=queue)
                 return datum
@@ -48,18 +66,44 @@ def move_skipped_to_admin_queue(datum, profile, project):
     settings.REDIS.srem(redis_serialize_set(queue), redis_serialize_data(datum))
 
 
+def batch_move_skipped_to_admin_queue(data, profile, project):
+    '''
+    Remove a list of data from AssignedData and redis
+
+    Change their assigned queues to the admin one for this project
+    '''
+    with transaction.atomic():
+        assignments = list(AssignedData.objects.filter(data__in=data, profile=profile)
+                           .select_related('data', 'queue'))
+        AssignedData.objects.filter(pk__in=[a.pk for a in assignments]).delete()
+
+        # change the queue to the admin one, with one update per old queue
+        new_queue = Queue.objects.get(project=project, type="admin")
+        queue_data = {}
+        for a in assignments:
+            queue_data.setdefault(a.queue_id, []).append(a.data_id)
+        for queue_id, data_ids in queue_data.items():
+            DataQueue.objects.filter(data__in=data_ids, queue=queue_id).update(queue=new_queue)
+
+    # remove the data from redis
+    pipeline = settings.REDIS.pipeline(transaction=False)
+    for a in assignments:
+        pipeline.srem(redis_serialize_set(a.queue), redis_serialize_data(a.data))
+    pipeline.execute()
+
+
 def get_assignments(profile, project, num_assignments):
     '''
     Check if a data is currently assigned to this profile/project;
     If so, return max(num_assignments, len(assigned) of it.
     If not, try to get a num_assigments of new assignments and return them.
     '''
-    existing_assignments = AssignedData.objects.filter(
+    existing_assignments = list(AssignedData.objects.filter(
         profile=profile,
-        queue__project=project)
+        queue__project=project).select_related('data')[:num_assignments])
 
     if len(existing_assignments) > 0:
-        return [assignment.data for assignment in existing_assignments[:num_assignments]]
+        return [assignment.data for assignment in existing_assignments]
     else:
         data = []
         more_irr = True
@@ -101,10 +145,16 @@ def batch_unassign(profile):
     Remove all of a profile's assignments and Re-add them to its respective
     queue in Redis.
     '''
-    assignments = AssignedData.objects.filter(profile=profile)
+    with transaction.atomic():
+        assignments = list(AssignedData.objects.filter(profile=profile)
+                           .select_related('data', 'queue'))
+        AssignedData.objects.filter(pk__in=[a.pk for a in assignments]).delete()
 
+    # Use a pipeline to re-add everything to redis in one round-trip
+    pipeline = settings.REDIS.pipeline(transaction=False)
     for a in assignments:
-        unassign_datum(a.data, profile)
+        pipeline.lpush(redis_serialize_queue(a.queue), redis_serialize_data(a.data))
+    pipeline.execute()
 
 
 def skip_data(datum, profile):
@@ -219,7 +269,9 @@ def process_irr_label(data, label):
 
         # update redis to reflect the queue changes
         irr_queue = Queue.objects.get(project=project, type="irr")
-        settings.REDIS.srem(redis_serialize_set(irr_queue), redis_serialize_data(data))
+        pipeline = settings.REDIS.pipeline(transaction=False)
+        pipeline.srem(redis_serialize_set(irr_queue), redis_serialize_data(data))
 
         if not agree:
-            settings.REDIS.sadd(redis_serialize_set(admin_queue), redis_serialize_data(data))
+            pipeline.sadd(redis_serialize_set(admin_queue), redis_serialize_data(data))
+        pipeline.execute()
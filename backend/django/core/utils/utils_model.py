@@ -17,7 +17,7 @@ import pandas as pd
 import pickle
 
 from core.models import (Data, Label, DataLabel, Model, DataPrediction,
-                         DataUncertainty, RecycleBin, IRRLog)
+                         DataUncertainty, RecycleBin, IRRLog, AssignedData)
 from core import tasks
 from core.utils.utils_queue import handle_empty_queue, fill_queue
 
@@ -218,7 +218,7 @@ def check_and_trigger_model(datum, profile=None):
         else:
             task_num = tasks.send_model_task.delay(project.pk)
             current_training_set.celery_task_id = task_num
-            current_training_set.save()
+            current_training_set.save(update_fields=['celery_task_id'])
             return_str = 'model running'
     elif profile:
         # Model is not running, check if user needs more data
@@ -231,6 +231,25 @@ def check_and_trigger_model(datum, profile=None):
     return return_str
 
 
+def check_and_trigger_model_after_coding(datum, profile):
+    """Run check_and_trigger_model after a coder labels or skips a datum.
+
+    If the coder has no data left, the check runs right away so their queue is
+    refilled before the response goes back, as the frontend asks for a new deck
+    as soon as the last card is done. Otherwise only the model check is needed,
+    and it is done in the background.
+
+    Args:
+        datum: Data object that was just labeled or skipped
+        profile: Profile of the coder
+    """
+    project = datum.project
+    if AssignedData.objects.filter(profile=profile, queue__project=project).exists():
+        tasks.send_check_and_trigger_model_task.delay(project.pk)
+    else:
+        check_and_trigger_model(datum, profile)
+
+
 def train_and_save_model(project):
     """Given a project create a model, train it, and save the model pickle
 
@@ -352,7 +352,7 @@ def handle_empty_queue(profile, project):
 
     if queue_count - assigned_toOthers_count == 0 and irr_count == irr_labeled_count:
         # if there is a model, use the orderby of the project, otherwise random
-        if len(Model.objects.filter(project=project)) > 0:
+        if Model.objects.filter(project=project).exists():
             fill_queue(queue=queue, orderby=project.learning_method,
                        irr_queue=irr_queue, irr_percent=project.percentage_irr,
                        batch_size=project.batch_size)
@@ -119,17 +119,19 @@ def sync_redis_objects(queue, orderby):
 
     data_ids = [redis_serialize_data(d) for d in queue.data.all()]
     if len(data_ids) > 0:
-        settings.REDIS.sadd(redis_serialize_set(queue), *data_ids)
-
-        redis_set_data = settings.REDIS.smembers(redis_serialize_set(queue))
-        redis_queue_data = settings.REDIS.lrange(redis_serialize_queue(queue), 0, -1)
+        # Use a pipeline to reduce back-and-forth with the server
+        pipeline = settings.REDIS.pipeline(transaction=False)
+        pipeline.sadd(redis_serialize_set(queue), *data_ids)
+        pipeline.smembers(redis_serialize_set(queue))
+        pipeline.lrange(redis_serialize_queue(queue), 0, -1)
+        _, redis_set_data, redis_queue_data = pipeline.execute()
 
         # IDs not already in redis queue
         new_data_ids = redis_parse_list_dataids(redis_set_data.difference(set(redis_queue_data)))
 
         # IDs not already assigned
         new_data_ids = set(new_data_ids).difference(
-            [str(a.data.pk) for a in AssignedData.objects.filter(queue=queue)])
+            [str(pk) for pk in AssignedData.objects.filter(queue=queue).values_list('data', flat=True)])
 
         ordered_data_ids = [redis_serialize_data(d)
                             for d in get_ordered_data(new_data_ids, orderby)]
@@ -1,21 +1,22 @@
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from django.db import transaction
+from django.db.models import Count, Case, When, Q
 from django.utils import timezone
 from django.utils.html import escape
 
 import math
 import random
 
-from core.serializers import LabelSerializer, DataSerializer
-from core.models import (Project, Data, Label, DataLabel,
+from core.models import (Profile, Project, Data, Label, DataLabel,
                          Queue, DataQueue, AssignedData,
                          LabelChangeLog, RecycleBin, IRRLog, AdminProgress)
 from core.templatetags import project_extras
 from core.permissions import IsAdminOrCreator, IsCoder
 from core.utils.utils_annotate import (process_irr_label, move_skipped_to_admin_queue,
-                                       label_data, unassign_datum, get_assignments)
-from core.utils.utils_model import check_and_trigger_model
+                                       batch_move_skipped_to_admin_queue, label_data,
+                                       batch_unassign, get_assignments, get_label)
+from core.utils.utils_model import check_and_trigger_model, check_and_trigger_model_after_coding
 
 
 @api_view(['GET'])
@@ -31,19 +32,26 @@ def get_card_deck(request, project_pk):
         data: The data in the queue
     """
     profile = request.user.profile
-    project = Project.objects.get(pk=project_pk)
+    project = Project.objects.annotate(num_perms=Count('projectpermissions')).get(pk=project_pk)
 
     # Calculate queue parameters
     batch_size = project.batch_size
-    num_coders = len(project.projectpermissions_set.all()) + 1
+    num_coders = project.num_perms + 1
     coder_size = math.ceil(batch_size / num_coders)
 
     data = get_assignments(profile, project, coder_size)
     # shuffle so the irr is not all at the front
     random.shuffle(data)
-    labels = Label.objects.all().filter(project=project)
+    # build the response directly, matching the LabelSerializer and DataSerializer fields
+    labels = list(Label.objects.filter(project=project).values('pk', 'name', 'project', 'description'))
+    cards = [{'pk': d.pk,
+              'text': d.text,
+              'project': d.project_id,
+              'irr_ind': d.irr_ind,
+              'hash': d.hash,
+              'upload_id_hash': d.upload_id_hash} for d in data]
 
-    return Response({'labels': LabelSerializer(labels, many=True).data, 'data': DataSerializer(data, many=True).data})
+    return Response({'labels': labels, 'data': cards})
 
 
 @api_view(['GET'])
@@ -61,17 +69,23 @@ def label_distribution_inverted(request, project_pk):
         a dictionary of the amount each label has been used
     """
     project = Project.objects.get(pk=project_pk)
-    labels = [l for l in project.labels.all()]
-    users = []
-    users.append(project.creator)
-    users.extend([perm.profile for perm in project.projectpermissions_set.all()])
+    labels = list(project.labels.all())
+    # get the creator and everyone with permissions in one query, creator first
+    users = Profile.objects.filter(Q(pk=project.creator_id) | Q(projectpermissions__project=project))\
+        .select_related('user').distinct()
+    users = sorted(users, key=lambda u: u.pk != project.creator_id)
+
+    # count every (profile, label) pair in one grouped query
+    label_counts = DataLabel.objects.filter(label__project=project)\
+        .values('profile', 'label').annotate(count=Count('id'))
+    count_dict = {(c['profile'], c['label']): c['count'] for c in label_counts}
 
     dataset = []
     all_counts = []
     for u in users:
         temp_values = []
         for l in labels:
-            label_count = DataLabel.objects.filter(profile=u, label=l).count()
+            label_count = count_dict.get((u.pk, l.pk), 0)
             all_counts.append(label_count)
             temp_values.append({'x': l.name, 'y': label_count})
         dataset.append({'key': u.__str__(), 'values': temp_values})
@@ -95,7 +109,7 @@ def skip_data(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     profile = request.user.profile
     project = data.project
     response = {}
@@ -103,26 +117,83 @@ def skip_data(request, data_pk):
     # if the data is IRR or processed IRR, dont add to admin queue yet
     num_history = IRRLog.objects.filter(data=data).count()
 
-    if RecycleBin.objects.filter(data=data).count() > 0:
+    if RecycleBin.objects.filter(data=data).exists():
         assignment = AssignedData.objects.get(data=data, profile=profile)
         assignment.delete()
     elif data.irr_ind or num_history > 0:
-        # unassign the skipped item
-        assignment = AssignedData.objects.get(data=data, profile=profile)
-        assignment.delete()
-
-        # log the data and check IRR but don't put in admin queue yet
-        IRRLog.objects.create(data=data, profile=profile, label=None, timestamp=timezone.now())
-        # if the IRR history has more than the needed number of labels , it is
-        # already processed so don't do anything else
-        if num_history <= project.num_users_irr:
-            process_irr_label(data, None)
+        with transaction.atomic():
+            # unassign the skipped item
+            assignment = AssignedData.objects.get(data=data, profile=profile)
+            assignment.delete()
+
+            # log the data and check IRR but don't put in admin queue yet
+            IRRLog.objects.create(data=data, profile=profile, label=None, timestamp=timezone.now())
+            # if the IRR history has more than the needed number of labels , it is
+            # already processed so don't do anything else
+            if num_history <= project.num_users_irr:
+                process_irr_label(data, None)
     else:
         # the data is not IRR so treat it as normal
         move_skipped_to_admin_queue(data, profile, project)
 
     # for all data, check if we need to refill queue
-    check_and_trigger_model(data, profile)
+    check_and_trigger_model_after_coding(data, profile)
+
+    return Response(response)
+
+
+@api_view(['POST'])
+@permission_classes((IsCoder, ))
+def skip_data_bulk(request, project_pk):
+    """Skip several data in the assigneddata queue for that user at once. This
+    has the same effect as calling skip_data on each datum, but batches the
+    database and redis writes.
+
+    Args:
+        request: The POST request, with a JSON list of data primary keys in dataIDs
+        project_pk: Primary key of the project
+    Returns:
+        {}
+    """
+    profile = request.user.profile
+    project = Project.objects.get(pk=project_pk)
+    response = {}
+
+    # only skip data that is actually assigned to this coder
+    data = list(Data.objects.filter(pk__in=request.data['dataIDs'], project=project,
+                                    assigneddata__profile=profile).distinct())
+
+    recycled_ids = set(RecycleBin.objects.filter(data__in=data).values_list('data', flat=True))
+    # the IRR history size of each datum, in one grouped query
+    num_history = dict(IRRLog.objects.filter(data__in=data).values_list('data')
+                       .annotate(Count('id')))
+
+    recycled_data = [d for d in data if d.pk in recycled_ids]
+    irr_data = [d for d in data if d.pk not in recycled_ids
+                and (d.irr_ind or num_history.get(d.pk, 0) > 0)]
+    normal_data = [d for d in data if d.pk not in recycled_ids
+                   and not (d.irr_ind or num_history.get(d.pk, 0) > 0)]
+
+    with transaction.atomic():
+        # unassign the recycled and IRR items
+        AssignedData.objects.filter(data__in=recycled_data + irr_data, profile=profile).delete()
+
+        # log the IRR data and check IRR but don't put in admin queue yet
+        now = timezone.now()
+        IRRLog.objects.bulk_create([IRRLog(data=d, profile=profile, label=None, timestamp=now)
+                                    for d in irr_data])
+        for d in irr_data:
+            # if the IRR history has more than the needed number of labels , it is
+            # already processed so don't do anything else
+            if num_history.get(d.pk, 0) <= project.num_users_irr:
+                process_irr_label(d, None)
+
+    # the data that is not IRR is treated as normal
+    batch_move_skipped_to_admin_queue(normal_data, profile, project)
+
+    # check once if we need to refill queue
+    if len(data) > 0:
+        check_and_trigger_model_after_coding(data[0], profile)
 
     return Response(response)
 
@@ -141,16 +212,16 @@ def annotate_data(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     project = data.project
     profile = request.user.profile
     response = {}
-    label = Label.objects.get(pk=request.data['labelID'])
+    label = get_label(project, request.data['labelID'])
     labeling_time = request.data['labeling_time']
 
     num_history = IRRLog.objects.filter(data=data).count()
 
-    if RecycleBin.objects.filter(data=data).count() > 0:
+    if RecycleBin.objects.filter(data=data).exists():
         # this data is no longer in use. delete it
         assignment = AssignedData.objects.get(data=data, profile=profile)
         assignment.delete()
@@ -167,7 +238,7 @@ def annotate_data(request, data_pk):
             process_irr_label(data, label)
 
     # for all data, check if we need to refill queue
-    check_and_trigger_model(data, profile)
+    check_and_trigger_model_after_coding(data, profile)
 
     return Response(response)
 
@@ -184,24 +255,22 @@ def discard_data(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     profile = request.user.profile
     project = data.project
     response = {}
 
     # Make sure coder is an admin
     if project_extras.proj_permission_level(data.project, profile) > 1:
-        # remove it from the admin queue
-        queue = Queue.objects.get(project=project, type="admin")
-        DataQueue.objects.get(data=data, queue=queue).delete()
-        IRRLog.objects.filter(data=data).delete()
-        Data.objects.filter(pk=data_pk).update(irr_ind=False)
-        RecycleBin.objects.create(data=data, timestamp=timezone.now())
-
-        # remove any IRR log data
-        irr_records = IRRLog.objects.filter(data=data)
-        irr_records.delete()
-
+        with transaction.atomic():
+            # remove it from the admin queue
+            queue = Queue.objects.get(project=project, type="admin")
+            DataQueue.objects.get(data=data, queue=queue).delete()
+
+            # remove any IRR log data
+            IRRLog.objects.filter(data=data).delete()
+            Data.objects.filter(pk=data_pk).update(irr_ind=False)
+            RecycleBin.objects.create(data=data, timestamp=timezone.now())
     else:
         response['error'] = 'Invalid credentials. Must be an admin.'
 
@@ -218,7 +287,7 @@ def restore_data(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     profile = request.user.profile
     response = {}
 
@@ -243,13 +312,13 @@ def modify_label(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     profile = request.user.profile
     response = {}
     project = data.project
 
-    label = Label.objects.get(pk=request.data['labelID'])
-    old_label = Label.objects.get(pk=request.data['oldLabelID'])
+    label = get_label(project, request.data['labelID'])
+    old_label = get_label(project, request.data['oldLabelID'])
     with transaction.atomic():
         DataLabel.objects.filter(data=data, label=old_label).update(label=label,
                                                                     time_to_label=0, timestamp=timezone.now())
@@ -272,18 +341,18 @@ def modify_label_to_skip(request, data_pk):
     Returns:
         {}
     """
-    data = Data.objects.get(pk=data_pk)
+    data = Data.objects.select_related('project').get(pk=data_pk)
     profile = request.user.profile
     response = {}
     project = data.project
-    old_label = Label.objects.get(pk=request.data['oldLabelID'])
+    old_label = get_label(project, request.data['oldLabelID'])
     queue = Queue.objects.get(project=project, type="admin")
 
     with transaction.atomic():
         DataLabel.objects.filter(data=data, label=old_label).delete()
         if data.irr_ind:
             # if it was irr, add it to the log
-            if len(IRRLog.objects.filter(data=data, profile=profile)) == 0:
+            if not IRRLog.objects.filter(data=data, profile=profile).exists():
                 IRRLog.objects.create(data=data, profile=profile,
                                       label=None, timestamp=timezone.now())
         else:
@@ -303,15 +372,16 @@ def check_admin_in_progress(request, project_pk):
     if it is alright to show the data.
     '''
     profile = request.user.profile
-    project = Project.objects.get(pk=project_pk)
+
+    # fetch everyone on the admin page with one query
+    progress_profiles = set(AdminProgress.objects.filter(project=project_pk)
+                            .values_list('profile', flat=True))
 
     # if nobody ELSE is there yet, return True
-    if AdminProgress.objects.filter(project=project).count() == 0:
+    if len(progress_profiles) == 0 or profile.pk in progress_profiles:
         return Response({"available": 1})
-    if AdminProgress.objects.filter(project=project, profile=profile).count() == 0:
-        return Response({"available": 0})
     else:
-        return Response({"available": 1})
+        return Response({"available": 0})
 
 
 @api_view(['GET'])
@@ -327,7 +397,7 @@ def enter_coding_page(request, project_pk):
     project = Project.objects.get(pk=project_pk)
     # check that no other admin is using it. If they are not, give this admin permission
     if project_extras.proj_permission_level(project, profile) > 1:
-        if AdminProgress.objects.filter(project=project).count() == 0:
+        if not AdminProgress.objects.filter(project=project).exists():
             AdminProgress.objects.create(project=project, profile=profile, timestamp=timezone.now())
     return Response({})
 
@@ -345,15 +415,11 @@ def leave_coding_page(request, project_pk):
     """
     profile = request.user.profile
     project = Project.objects.get(pk=project_pk)
-    assigned_data = AssignedData.objects.filter(profile=profile)
 
-    for assignment in assigned_data:
-        unassign_datum(assignment.data, profile)
+    batch_unassign(profile)
 
     if project_extras.proj_permission_level(project, profile) > 1:
-        if AdminProgress.objects.filter(project=project, profile=profile).count() > 0:
-            prog = AdminProgress.objects.get(project=project, profile=profile)
-            prog.delete()
+        AdminProgress.objects.filter(project=project, profile=profile).delete()
     return Response({})
 
 
@@ -370,18 +436,17 @@ def data_unlabeled_table(request, project_pk):
     """
     project = Project.objects.get(pk=project_pk)
 
-    stuff_in_queue = DataQueue.objects.filter(queue__project=project)
-    queued_ids = [queued.data.id for queued in stuff_in_queue]
+    queued_ids = DataQueue.objects.filter(queue__project=project).values_list('data__pk', flat=True)
 
     recycle_ids = RecycleBin.objects.filter(
         data__project=project).values_list('data__pk', flat=True)
     unlabeled_data = project.data_set.filter(datalabel__isnull=True).exclude(
-        id__in=queued_ids).exclude(id__in=recycle_ids)
+        id__in=queued_ids).exclude(id__in=recycle_ids).values('id', 'text')
     data = []
     for d in unlabeled_data:
         temp = {
-            'Text': escape(d.text),
-            'ID': d.id
+            'Text': escape(d['text']),
+            'ID': d['id']
         }
         data.append(temp)
 
@@ -399,20 +464,19 @@ def data_admin_table(request, project_pk):
     Returns:
         data: a list of data information
     """
-    project = Project.objects.get(pk=project_pk)
-    queue = Queue.objects.filter(project=project, type="admin")
+    queue = Queue.objects.get(project=project_pk, type="admin")
 
-    data_objs = DataQueue.objects.filter(queue=queue)
+    data_objs = DataQueue.objects.filter(queue=queue).values('data__id', 'data__text', 'data__irr_ind')
 
     data = []
     for d in data_objs:
-        if d.data.irr_ind:
+        if d['data__irr_ind']:
             reason = "IRR"
         else:
             reason = "Skipped"
         temp = {
-            'Text': d.data.text,
-            'ID': d.data.id,
+            'Text': d['data__text'],
+            'ID': d['data__id'],
             'Reason': reason
         }
         data.append(temp)
@@ -432,10 +496,13 @@ def data_admin_counts(request, project_pk):
         data: a list of data information
     """
     project = Project.objects.get(pk=project_pk)
-    queue = Queue.objects.filter(project=project, type="admin")
-    data_objs = DataQueue.objects.filter(queue=queue)
-    irr_count = data_objs.filter(data__irr_ind=True).count()
-    skip_count = data_objs.filter(data__irr_ind=False).count()
+    queue = Queue.objects.get(project=project, type="admin")
+    # count both kinds of admin data in a single pass over the queue
+    counts = DataQueue.objects.filter(queue=queue).aggregate(
+        irr_count=Count(Case(When(data__irr_ind=True, then=1))),
+        skip_count=Count(Case(When(data__irr_ind=False, then=1))))
+    irr_count = counts['irr_count']
+    skip_count = counts['skip_count']
     # only give both counts if both counts are relevent
     if project.percentage_irr == 0:
         return Response({'data': {"SKIP": skip_count}})
@@ -455,13 +522,13 @@ def recycle_bin_table(request, project_pk):
         data: a list of data information
     """
     project = Project.objects.get(pk=project_pk)
-    data_objs = RecycleBin.objects.filter(data__project=project)
+    data_objs = RecycleBin.objects.filter(data__project=project).values('data__id', 'data__text')
 
     data = []
     for d in data_objs:
         temp = {
-            'Text': d.data.text,
-            'ID': d.data.id
+            'Text': d['data__text'],
+            'ID': d['data__id']
         }
         data.append(temp)
 
@@ -481,9 +548,9 @@ def label_skew_label(request, data_pk):
         {}
     """
 
-    datum = Data.objects.get(pk=data_pk)
+    datum = Data.objects.select_related('project').get(pk=data_pk)
     project = datum.project
-    label = Label.objects.get(pk=request.data['labelID'])
+    label = get_label(project, request.data['labelID'])
     profile = request.user.profile
     response = {}
 
@@ -516,9 +583,9 @@ def label_admin_label(request, data_pk):
     Returns:
         {}
     """
-    datum = Data.objects.get(pk=data_pk)
+    datum = Data.objects.select_related('project').get(pk=data_pk)
     project = datum.project
-    label = Label.objects.get(pk=request.data['labelID'])
+    label = get_label(project, request.data['labelID'])
     profile = request.user.profile
     response = {}
 
@@ -546,6 +613,19 @@ def label_admin_label(request, data_pk):
     return Response(response)
 
 
+def format_label_timestamp(timestamp):
+    """Format a label timestamp for the history table, e.g. '2018-07-30, 9:05.03'
+
+    Args:
+        timestamp: a datetime or None
+    Returns:
+        the formatted string, or "None" if there is no timestamp
+    """
+    if timestamp is None:
+        return "None"
+    return "{0:%Y-%m-%d}, {1}:{0:%M.%S}".format(timestamp, timestamp.hour)
+
+
 @api_view(['GET'])
 @permission_classes((IsCoder, ))
 def get_label_history(request, project_pk):
@@ -563,35 +643,29 @@ def get_label_history(request, project_pk):
     project = Project.objects.get(pk=project_pk)
 
     labels = Label.objects.all().filter(project=project)
-    data = DataLabel.objects.filter(profile=profile, data__project=project_pk, label__in=labels)
+    data = DataLabel.objects.filter(profile=profile, data__project=project_pk, label__in=labels)\
+        .select_related('data', 'label')\
+        .only('timestamp', 'data__text', 'data__irr_ind', 'label__name')
+
+    # fetch every data id in the IRR log at once rather than querying per row
+    irr_data_ids = set(IRRLog.objects.filter(data__project=project_pk).values_list('data', flat=True))
 
-    data_list = []
+    data_list = set()
     results = []
     for d in data:
         # if it is not labeled irr but is in the log, the data is resolved IRR,
-        if not d.data.irr_ind and len(IRRLog.objects.filter(data=d.data)) > 0:
+        if not d.data.irr_ind and d.data_id in irr_data_ids:
             continue
 
-        data_list.append(d.data.id)
-        if d.timestamp:
-            if d.timestamp.minute < 10:
-                minute = "0" + str(d.timestamp.minute)
-            else:
-                minute = str(d.timestamp.minute)
-            if d.timestamp.second < 10:
-                second = "0" + str(d.timestamp.second)
-            else:
-                second = str(d.timestamp.second)
-            new_timestamp = str(d.timestamp.date()) + ", " + str(d.timestamp.hour)\
-                + ":" + minute + "." + second
-        else:
-            new_timestamp = "None"
+        data_list.add(d.data.id)
+        new_timestamp = format_label_timestamp(d.timestamp)
         temp_dict = {"data": d.data.text,
                      "id": d.data.id, "label": d.label.name,
                      "labelID": d.label.id, "timestamp": new_timestamp, "edit": "yes"}
         results.append(temp_dict)
 
-    data_irr = IRRLog.objects.filter(profile=profile, data__project=project_pk, label__isnull=False)
+    data_irr = IRRLog.objects.filter(profile=profile, data__project=project_pk, label__isnull=False)\
+        .select_related('data', 'label')
 
     for d in data_irr:
         # if the data was labeled by that person (they were the admin), don't add
@@ -599,19 +673,7 @@ def get_label_history(request, project_pk):
         if d.data.id in data_list:
             continue
 
-        if d.timestamp:
-            if d.timestamp.minute < 10:
-                minute = "0" + str(d.timestamp.minute)
-            else:
-                minute = str(d.timestamp.minute)
-            if d.timestamp.second < 10:
-                second = "0" + str(d.timestamp.second)
-            else:
-                second = str(d.timestamp.second)
-            new_timestamp = str(d.timestamp.date()) + ", " + str(d.timestamp.hour)\
-                + ":" + minute + "." + second
-        else:
-            new_timestamp = "None"
+        new_timestamp = format_label_timestamp(d.timestamp)
         temp_dict = {"data": d.data.text,
                      "id": d.data.id, "label": d.label.name,
                      "labelID": d.label.id, "timestamp": new_timestamp, "edit": "no"}
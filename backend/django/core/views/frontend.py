@@ -220,7 +220,8 @@ class ProjectCreateWizard(LoginRequiredMixin, SessionWizardView):
             proj_obj.percentage_irr = advanced_data["percentage_irr"]
             proj_obj.num_users_irr = advanced_data["num_users_irr"]
             proj_obj.classifier = advanced_data["classifier"]
-            proj_obj.save()
+            proj_obj.save(update_fields=['codebook_file', 'batch_size', 'learning_method',
+                                         'percentage_irr', 'num_users_irr', 'classifier'])
 
             # Training Set
             TrainingSet.objects.create(project=proj_obj, set_number=0)
@@ -360,7 +361,7 @@ class ProjectUpdateCodebook(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
                 if cb_data and cb_data != "":
                     cb_filepath = save_codebook_file(cb_data, self.object.pk)
                     self.object.codebook_file = cb_filepath
-                    self.object.save()
+                    self.object.save(update_fields=['codebook_file'])
 
                 return redirect(self.get_success_url())
         else:
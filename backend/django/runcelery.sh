@@ -9,4 +9,5 @@ while [ $n -ne 0 ]; do
     n=$?
 done
 
+celery -A smart worker -l info -Q model_trigger -n model_trigger@%h &
 celery -A smart worker -l info -n default@%h 
\ No newline at end of file
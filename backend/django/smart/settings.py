@@ -192,6 +192,11 @@ class Dev(Configuration):
     CELERY_ACCEPT_CONTENT = ['json']
     CELERY_TASK_SERIALIZER = 'json'
     CELERY_RESULT_SERIALIZER = 'json'
+    # Keep the per-annotation model checks on their own queue so slow checks
+    # don't hold up model training and data upload tasks
+    CELERY_TASK_ROUTES = {
+        'core.tasks.send_check_and_trigger_model_task': {'queue': 'model_trigger'},
+    }
 
     STATICFILES_DIRS = [
         os.path.join(BASE_DIR, 'frontend', 'dist'),
@@ -1,9 +1,12 @@
+import json
+
 from core.management.commands.seed import (SEED_USERNAME, SEED_PASSWORD,
                                            SEED_USERNAME2, SEED_PASSWORD2)
 from core.models import (Profile, DataQueue, DataLabel, Data, ProjectPermissions,
                          LabelChangeLog, AssignedData, IRRLog, RecycleBin)
 from core.utils.utils_annotate import get_assignments
 from core.utils.utils_queue import fill_queue
+from core import tasks
 from test.util import assert_collections_equal, sign_in_and_fill_queue
 
 
@@ -80,6 +83,37 @@ def test_annotate_data(seeded_database, client, test_project_data, test_queue, t
     assert DataQueue.objects.filter(data=data[0]).count() == 0
 
 
+def test_card_deck_refills_after_last_card(seeded_database, client, test_project_data, test_all_queues, test_labels, monkeypatch):
+    '''
+    This tests that the coder's queue is refilled before the response to their
+    last card, even when the background model check does not run.
+    '''
+    project = test_project_data
+    normal_queue, admin_queue, irr_queue = test_all_queues
+    fill_queue(normal_queue, 'random', irr_queue, project.percentage_irr, project.batch_size)
+
+    client.login(username=SEED_USERNAME, password=SEED_PASSWORD)
+    client_profile = Profile.objects.get(user__username=SEED_USERNAME)
+    ProjectPermissions.objects.create(profile=client_profile,
+                                      project=project,
+                                      permission='CODER')
+
+    # the celery tasks run eagerly in tests, so drop the background check entirely
+    monkeypatch.setattr(tasks.send_check_and_trigger_model_task, 'delay',
+                        lambda *args, **kwargs: None)
+
+    # label every card in more decks than the filled queue holds. A new deck
+    # should be ready as soon as the last card of the previous one is labeled.
+    for i in range(3):
+        cards = client.get('/api/get_card_deck/' + str(project.pk) + '/').json()['data']
+        assert len(cards) > 0
+        for card in cards:
+            response = client.post('/api/annotate_data/' + str(card['pk']) + '/', {
+                                   "labelID": test_labels[0].pk, "labeling_time": 3
+                                   })
+            assert 'error' not in response.json() and 'detail' not in response.json()
+
+
 def test_skip_data(seeded_database, client, test_project_data, test_queue, test_irr_queue, test_labels, test_admin_queue):
     '''
     This tests that the skip data api works
@@ -244,6 +278,98 @@ def test_skip_data_api(seeded_database, client, test_project_half_irr_data, test
                 data__pk=card["pk"], profile=client_profile).count() == 0
 
 
+def test_skip_data_bulk_api(seeded_database, client, test_project_half_irr_data, test_half_irr_all_queues,
+                            test_labels_half_irr, test_profile, test_profile2, test_profile3):
+    '''
+    This tests that skipping a whole card deck at once matches skipping each card
+    '''
+    # sign in users
+    normal_queue, admin_queue, irr_queue = test_half_irr_all_queues
+    project = test_project_half_irr_data
+
+    fill_queue(normal_queue, 'random', irr_queue, project.percentage_irr, project.batch_size)
+
+    client.login(username=SEED_USERNAME, password=SEED_PASSWORD)
+    client_profile = Profile.objects.get(user__username=SEED_USERNAME)
+    ProjectPermissions.objects.create(profile=client_profile,
+                                      project=project,
+                                      permission='CODER')
+
+    cards = client.get('/api/get_card_deck/' + str(project.pk) + '/').json()['data']
+    assert len(cards) > 2
+
+    # put one card in the recycle bin
+    recycled_card = cards[0]
+    RecycleBin.objects.create(data_id=recycled_card["pk"])
+
+    # make another card processed IRR, with more history than the project needs
+    processed_card = cards[1]
+    Data.objects.filter(pk=processed_card["pk"]).update(irr_ind=True)
+    for profile in [test_profile, test_profile2, test_profile3]:
+        IRRLog.objects.create(data_id=processed_card["pk"], profile=profile, label=None)
+    processed_queue = DataQueue.objects.get(data__pk=processed_card["pk"]).queue
+
+    # skip the whole deck at once
+    response = client.post('/api/skip_data_bulk/' + str(project.pk) + '/',
+                           json.dumps({'dataIDs': [card["pk"] for card in cards]}),
+                           content_type='application/json')
+    assert 'error' not in response.json() and 'detail' not in response.json()
+
+    for card in cards:
+        assert AssignedData.objects.filter(
+            data__pk=card["pk"], profile=client_profile).count() == 0
+
+    # recycled data is only unassigned
+    assert IRRLog.objects.filter(data__pk=recycled_card["pk"]).count() == 0
+    assert DataQueue.objects.filter(data__pk=recycled_card["pk"], queue=admin_queue).count() == 0
+
+    # processed IRR data is logged but not processed again, so it stays where it was
+    assert IRRLog.objects.filter(data__pk=processed_card["pk"]).count() == 4
+    assert DataQueue.objects.filter(data__pk=processed_card["pk"], queue=processed_queue).count() == 1
+    assert DataQueue.objects.filter(data__pk=processed_card["pk"], queue=admin_queue).count() == 0
+
+    for card in cards[2:]:
+        if card["irr_ind"]:
+            # if it was irr data, check that it is logged and not in admin queue
+            assert IRRLog.objects.filter(data__pk=card["pk"], profile=client_profile,
+                                         label__isnull=True).count() == 1
+            assert DataQueue.objects.filter(data__pk=card["pk"], queue=admin_queue).count() == 0
+            assert DataQueue.objects.filter(data__pk=card["pk"], queue=irr_queue).count() == 1
+        else:
+            # if it is not irr data, check that it is in admin queue
+            assert DataQueue.objects.filter(data__pk=card["pk"], queue=admin_queue).count() == 1
+            assert DataQueue.objects.filter(data__pk=card["pk"], queue=normal_queue).count() == 0
+
+
+def test_skip_data_bulk_unassigned(seeded_database, client, test_project_half_irr_data, test_half_irr_all_queues, test_labels_half_irr):
+    '''
+    This tests that a coder can't bulk skip data that was never assigned to them
+    '''
+    normal_queue, admin_queue, irr_queue = test_half_irr_all_queues
+    project = test_project_half_irr_data
+
+    fill_queue(normal_queue, 'random', irr_queue, project.percentage_irr, project.batch_size)
+
+    client.login(username=SEED_USERNAME, password=SEED_PASSWORD)
+    client_profile = Profile.objects.get(user__username=SEED_USERNAME)
+    ProjectPermissions.objects.create(profile=client_profile,
+                                      project=project,
+                                      permission='CODER')
+
+    # pick IRR data in the queue that nobody has been assigned
+    datum = DataQueue.objects.filter(queue=irr_queue).first().data
+    assert not AssignedData.objects.filter(data=datum).exists()
+
+    response = client.post('/api/skip_data_bulk/' + str(project.pk) + '/',
+                           json.dumps({'dataIDs': [datum.pk]}),
+                           content_type='application/json')
+    assert 'error' not in response.json() and 'detail' not in response.json()
+
+    assert not IRRLog.objects.filter(data=datum).exists()
+    assert DataQueue.objects.filter(data=datum, queue=irr_queue).count() == 1
+    assert DataQueue.objects.filter(data=datum, queue=admin_queue).count() == 0
+
+
 def test_admin_label(seeded_database, admin_client, client, test_project_data, test_queue, test_labels, test_irr_queue, test_admin_queue):
     '''
     This tests the admin ability to label skipped items in the admin table
@@ -1,6 +1,9 @@
+import pytest
+
 from core.models import Data, AssignedData, Label, DataLabel, DataQueue
 from core.utils.utils_annotate import (assign_datum, label_data, move_skipped_to_admin_queue,
-                                       get_assignments, unassign_datum)
+                                       get_assignments, unassign_datum, batch_unassign,
+                                       get_label)
 from core.utils.utils_queue import fill_queue
 from test.util import assert_obj_exists
 from test.conftest import TEST_QUEUE_LEN
@@ -238,6 +241,26 @@ def test_unassign(db, test_profile, test_project_data, test_queue, test_redis):
     assert reassigned_datum == datum
 
 
+def test_batch_unassign(db, test_profile, test_project_data, test_queue, test_redis):
+    fill_queue(test_queue, orderby='random')
+
+    data = get_assignments(test_profile, test_project_data, 10)
+
+    assert test_redis.llen('queue:' + str(test_queue.pk)) == (test_queue.length - 10)
+    assert AssignedData.objects.filter(profile=test_profile).count() == 10
+
+    batch_unassign(test_profile)
+
+    assert test_redis.llen('queue:' + str(test_queue.pk)) == test_queue.length
+    assert test_redis.scard('set:' + str(test_queue.pk)) == test_queue.length
+    assert not AssignedData.objects.filter(profile=test_profile).exists()
+
+    # The unassigned data should be the next to be assigned
+    reassigned_data = get_assignments(test_profile, test_project_data, 10)
+
+    assert set(reassigned_data) == set(data)
+
+
 def test_unassign_after_fillqueue(db, test_profile, test_project_data, test_queue, test_labels, test_redis):
     fill_queue(test_queue, 'random')
 
@@ -276,3 +299,18 @@ def test_skip_data(db, test_profile, test_queue, test_admin_queue, test_redis):
     assert DataQueue.objects.filter(data=datum, queue=test_admin_queue).exists()
     # make sure not in normal queue
     assert not DataQueue.objects.filter(data=datum, queue=test_queue).exists()
+
+
+def test_get_label(db, test_project_data, test_labels):
+    label = test_labels[0]
+    assert get_label(test_project_data, label.pk) == label
+    assert get_label(test_project_data, str(label.pk)) == label
+
+    # new labels are picked up after the cache is filled
+    new_label = Label.objects.create(name='new label', project=test_project_data)
+    assert get_label(test_project_data, new_label.pk) == new_label
+
+    new_label_pk = new_label.pk
+    new_label.delete()
+    with pytest.raises(Label.DoesNotExist):
+        get_label(test_project_data, new_label_pk)